@@ -1,39 +1,115 @@
-from fastapi import FastAPI, Request, Depends, HTTPException, Form, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Depends, HTTPException, Form, BackgroundTasks
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 
 from fastapi.templating import Jinja2Templates
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+import asyncio
+import logging
 import os
+import orjson
+from typing import Any, Dict
 from dotenv import load_dotenv
-from jose import JWTError, jwt
+from jose import JWTError
 
-from .database import get_db, create_tables
+from .database import SessionLocal, engine, get_db, create_tables
 from .models import User, Project, Analysis
-from .auth import get_password_hash, verify_password, create_access_token, get_current_active_user
+from .schemas import ProjectDataResponse
+from .auth import create_access_token, decode_token, get_current_active_user
 from .seo_engine import SEOEngine
-from .utils import validate_keyword, generate_project_title, calculate_analysis_score
+from .utils import (
+    validate_keyword, generate_project_title, calculate_analysis_score,
+    format_timestamp, format_content_outline
+)
 
 load_dotenv()
 
-# JWT Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="SEO Content Generator", version="1.0.0")
+app = FastAPI(
+    title="SEO Content Generator",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # Static files not needed for this app
 
-# Templates
-templates = Jinja2Templates(directory="templates")
+# Templates; only re-stat them for changes while developing
+templates = Jinja2Templates(
+    directory="templates",
+    auto_reload=os.getenv("DEBUG", "False").lower() == "true"
+)
+templates.env.filters["timestamp"] = format_timestamp
 
 # SEO Engine instance
 seo_engine = SEOEngine()
 
+# Admission control: analyses allowed to run at once before new ones get 429
+MAX_CONCURRENT_ANALYSES = int(os.getenv("MAX_CONCURRENT_ANALYSES", "4"))
+analysis_slots = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+# Seconds between status checks on the project event stream, and the longest
+# a stream stays open (a project can be left "processing" by a restart)
+STATUS_POLL_INTERVAL = 1.0
+STATUS_STREAM_TIMEOUT = 600.0
+
+# INSERT construct with ON CONFLICT support for the configured database
+dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+
+async def acquire_analysis_slot():
+    """Claim an analysis slot, rejecting new work while every slot is busy.
+
+    The caller owns the slot and must release it once the analysis is done.
+    """
+    if analysis_slots.locked():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many analyses in progress, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    # A slot is free, so this returns without suspending
+    await analysis_slots.acquire()
+
+def analysis_fields(keyword: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a completed engine result onto Analysis columns, filling in fallbacks"""
+    serp_results = analysis_result.get('serp_results', [])
+    analysis = analysis_result.get('analysis', {})
+    entities = analysis.get('entities', [])
+    tfidf_keywords = analysis.get('tfidf_keywords', [])
+    outline = analysis.get('content_outline')
+    content_outline = format_content_outline(outline) if outline else ''
+    schema_markup = analysis.get('schema_markup', '')
+    
+    # Provide fallback data if analysis is empty
+    if not entities:
+        entities = [{"text": keyword, "label": "TOPIC"}]
+    if not tfidf_keywords:
+        tfidf_keywords = [{"keyword": keyword, "score": 1.0}]
+    if not content_outline:
+        content_outline = f"# {keyword.title()}\n\n## Introduction\n\n## Main Content\n\n## Conclusion"
+    if not schema_markup:
+        schema_markup = '{"@context": "https://schema.org", "@type": "Article", "headline": "' + keyword + '"}'
+    
+    return dict(
+        serp_results=serp_results,
+        entities=entities,
+        tfidf_keywords=tfidf_keywords,
+        competitor_urls=serp_results,  # Use SERP results as competitor URLs
+        content_outline=content_outline,
+        schema_markup=schema_markup
+    )
+
+async def run_seo_analysis(keyword: str):
+    """Run the SEO engine off the event loop; the caller holds an analysis slot"""
+    return await run_in_threadpool(seo_engine.run_full_analysis, keyword)
+
 # Create tables on startup
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    await create_tables()
 
 # Landing page
 @app.get("/", response_class=HTMLResponse)
@@ -44,30 +120,24 @@ async def landing_page(request: Request):
 @app.post("/capture-email")
 async def capture_email(
     email: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == email).first()
-    
-    if existing_user:
-        # User exists, create access token
-        access_token = create_access_token(data={"sub": existing_user.username})
-        return RedirectResponse(url=f"/generator?token={access_token}", status_code=303)
-    
-    # Create new user with email only
-    user = User(
+    # Create the user with email only, leaving an existing account untouched
+    stmt = dialect_insert(User).values(
         username=email.split('@')[0],  # Use email prefix as username
         email=email,
         hashed_password="",  # No password needed
         is_active=1
-    )
+    ).on_conflict_do_nothing(index_elements=["email"])
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.execute(stmt)
+    await db.commit()
+    
+    result = await db.execute(select(User.username).where(User.email == email))
+    username = result.scalar_one()
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": username})
     return RedirectResponse(url=f"/generator?token={access_token}", status_code=303)
 
 # Direct access generator (no login required)
@@ -78,7 +148,7 @@ async def generator_page(request: Request, token: str = None):
     
     try:
         # Verify token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         if username is None:
             return RedirectResponse(url="/", status_code=303)
@@ -92,93 +162,81 @@ async def generator_page(request: Request, token: str = None):
 async def create_project(
     keyword: str = Form(...),
     token: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    keyword = keyword.strip()
+    
     try:
         # Verify token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
         # Get user
-        user = db.query(User).filter(User.username == username).first()
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Create project
-        project = Project(
-            user_id=user.id,
-            keyword=keyword,
-            title=generate_project_title(keyword),
-            status="pending"
-        )
-        
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        
-        # Run analysis
-        analysis_result = seo_engine.run_full_analysis(keyword)
-        
-        # Check if analysis was successful
-        if analysis_result.get('status') != 'completed':
-            raise HTTPException(status_code=500, detail=f"Analysis failed: {analysis_result.get('error', 'Unknown error')}")
-        
-        # Get analysis data with fallbacks
-        serp_results = analysis_result.get('serp_results', [])
-        entities = analysis_result.get('analysis', {}).get('entities', [])
-        tfidf_keywords = analysis_result.get('analysis', {}).get('tfidf_keywords', [])
-        content_outline = analysis_result.get('content_outline', '')
-        schema_markup = analysis_result.get('schema_markup', '')
-        
-        # Provide fallback data if analysis is empty
-        if not entities:
-            entities = [{"text": keyword, "label": "TOPIC"}]
-        if not tfidf_keywords:
-            tfidf_keywords = [{"keyword": keyword, "score": 1.0}]
-        if not content_outline:
-            content_outline = f"# {keyword.title()}\n\n## Introduction\n\n## Main Content\n\n## Conclusion"
-        if not schema_markup:
-            schema_markup = '{"@context": "https://schema.org", "@type": "Article", "headline": "' + keyword + '"}'
-        
-        # Save analysis
-        analysis = Analysis(
-            project_id=project.id,
-            serp_results=serp_results,
-            entities=entities,
-            tfidf_keywords=tfidf_keywords,
-            competitor_urls=serp_results,  # Use SERP results as competitor URLs
-            content_outline=content_outline,
-            schema_markup=schema_markup
-        )
-        
-        db.add(analysis)
-        db.commit()
-        
-        return RedirectResponse(url=f"/results/{project.id}?token={token}", status_code=303)
+        # Claim an analysis slot only for an authenticated request
+        await acquire_analysis_slot()
+        try:
+            # Create project
+            project = Project(
+                user_id=user.id,
+                keyword=keyword,
+                title=generate_project_title(keyword),
+                status="pending"
+            )
+            
+            db.add(project)
+            await db.commit()
+            await db.refresh(project)
+            
+            # Run analysis
+            analysis_result = await run_seo_analysis(keyword)
+            
+            # Check if analysis was successful
+            if analysis_result.get('status') != 'completed':
+                raise HTTPException(status_code=500, detail=f"Analysis failed: {analysis_result.get('error', 'Unknown error')}")
+            
+            # Save analysis
+            db.add(Analysis(project_id=project.id, **analysis_fields(keyword, analysis_result)))
+            await db.commit()
+            
+            return RedirectResponse(url=f"/results/{project.id}?token={token}", status_code=303)
+        finally:
+            analysis_slots.release()
         
+    except HTTPException:
+        raise
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # View results
 @app.get("/results/{project_id}", response_class=HTMLResponse)
-async def view_results(request: Request, project_id: int, token: str = None, db: Session = Depends(get_db)):
+async def view_results(request: Request, project_id: int, token: str = None, db: AsyncSession = Depends(get_db)):
     if not token:
         return RedirectResponse(url="/", status_code=303)
     
     try:
         # Verify token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         if username is None:
             return RedirectResponse(url="/", status_code=303)
     except JWTError:
         return RedirectResponse(url="/", status_code=303)
     
-    # Get project and analysis
-    project = db.query(Project).filter(Project.id == project_id).first()
-    analysis = db.query(Analysis).filter(Analysis.project_id == project_id).first()
+    # Get project and analysis in a single query
+    result = await db.execute(
+        select(Project).options(joinedload(Project.analysis)).where(Project.id == project_id)
+    )
+    project = result.scalars().first()
+    analysis = project.analysis if project else None
     
     if not project or not analysis:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -190,13 +248,14 @@ async def view_results(request: Request, project_id: int, token: str = None, db:
         "token": token
     })
 
-# Create new project
+# Create new project from the dashboard
 @app.post("/project")
-async def create_project(
+async def create_dashboard_project(
     keyword: str = Form(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    keyword = keyword.strip()
     if not validate_keyword(keyword):
         raise HTTPException(status_code=400, detail="Invalid keyword")
     
@@ -209,59 +268,89 @@ async def create_project(
     )
     
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return RedirectResponse(url="/dashboard", status_code=303)
 
+# Background worker for project analysis
+async def analyze_project(project_id: int):
+    """Run the SEO analysis for a project and store the result.
+
+    Executed as a background task so the request that queued it returns
+    immediately; uses its own session since the request's one is closed.
+    Takes over the analysis slot claimed by the request and releases it.
+    """
+    try:
+        await _analyze_project(project_id)
+    finally:
+        analysis_slots.release()
+
+async def _analyze_project(project_id: int):
+    async with SessionLocal() as db:
+        project = await db.get(Project, project_id, options=[joinedload(Project.analysis)])
+        if not project:
+            return
+        
+        try:
+            analysis_result = await run_seo_analysis(project.keyword)
+            
+            if analysis_result["status"] == "completed":
+                fields = analysis_fields(project.keyword, analysis_result)
+                
+                # A project has at most one analysis, so a rerun overwrites it
+                if project.analysis is None:
+                    db.add(Analysis(project_id=project.id, **fields))
+                else:
+                    for name, value in fields.items():
+                        setattr(project.analysis, name, value)
+                project.status = "completed"
+            else:
+                logger.error(
+                    "Analysis failed for project %s: %s",
+                    project_id, analysis_result.get("error", "Unknown error")
+                )
+                project.status = "failed"
+            await db.commit()
+            
+        except Exception:
+            logger.exception("Analysis failed for project %s", project_id)
+            await db.rollback()
+            project.status = "failed"
+            await db.commit()
+
 # Run SEO analysis
 @app.post("/analyze/{project_id}")
 async def run_analysis(
     project_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Get project
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Project).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Update status
-    project.status = "processing"
-    db.commit()
+    await acquire_analysis_slot()
     
+    # Update status; clients follow /events/{id} until the worker finishes
     try:
-        # Run SEO analysis
-        analysis_result = seo_engine.run_full_analysis(project.keyword)
-        
-        if analysis_result["status"] == "completed":
-            # Create analysis record
-            analysis = Analysis(
-                project_id=project.id,
-                serp_results=analysis_result["serp_results"],
-                entities=analysis_result["analysis"]["entities"],
-                tfidf_keywords=analysis_result["analysis"]["tfidf_keywords"],
-                competitor_urls=analysis_result["analysis"].get("h2_analysis", []),
-                content_outline=analysis_result["content_outline"],
-                schema_markup=analysis_result["schema_markup"]
-            )
-            
-            db.add(analysis)
-            project.status = "completed"
-            db.commit()
-            
-        else:
-            project.status = "failed"
-            db.commit()
-            
-    except Exception as e:
-        project.status = "failed"
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        project.status = "processing"
+        await db.commit()
+    except Exception:
+        analysis_slots.release()
+        raise
+    
+    # The worker now owns the slot
+    background_tasks.add_task(analyze_project, project.id)
     
     return RedirectResponse(url="/dashboard", status_code=303)
 
@@ -271,18 +360,21 @@ async def view_project(
     project_id: int,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Get project and analysis
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.user_id == current_user.id
-    ).first()
+    # Get project with its analysis
+    result = await db.execute(
+        select(Project).options(joinedload(Project.analysis)).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    analysis = db.query(Analysis).filter(Analysis.project_id == project.id).first()
+    analysis = project.analysis
     
     if analysis:
         # Calculate analysis score
@@ -303,32 +395,68 @@ async def view_project(
     })
 
 # API endpoint for getting project data
-@app.get("/api/project/{project_id}")
+@app.get("/api/project/{project_id}", response_model=ProjectDataResponse)
 async def get_project_data(
     project_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Project).options(joinedload(Project.analysis)).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    analysis = db.query(Analysis).filter(Analysis.project_id == project.id).first()
+    return ProjectDataResponse(project=project, analysis=project.analysis)
+
+async def project_status_events(project_id: int):
+    """Yield a server-sent event per status change while analysis is processing"""
+    status = None
+    deadline = asyncio.get_running_loop().time() + STATUS_STREAM_TIMEOUT
+    while True:
+        async with SessionLocal() as db:
+            result = await db.execute(select(Project.status).where(Project.id == project_id))
+            current = result.scalar_one_or_none()
+        
+        if current != status:
+            status = current
+            yield f"data: {orjson.dumps({'status': status}).decode()}\n\n"
+        
+        if status != "processing" or asyncio.get_running_loop().time() >= deadline:
+            break
+        await asyncio.sleep(STATUS_POLL_INTERVAL)
+
+# Project status stream
+@app.get("/events/{project_id}")
+async def project_events(
+    project_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(Project.id).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
     
-    return {
-        "project": {
-            "id": project.id,
-            "keyword": project.keyword,
-            "title": project.title,
-            "status": project.status,
-            "created_at": project.created_at.isoformat()
-        },
-        "analysis": analysis.to_dict() if analysis else None
-    }
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Hand the connection back now; the request session otherwise stays open
+    # until the stream ends, and the stream polls with short-lived sessions
+    await db.close()
+    
+    return StreamingResponse(
+        project_status_events(project_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
 # Health check
 @app.get("/health")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -28,12 +28,17 @@ class Project(Base):
     
     user = relationship("User", back_populates="projects")
     analysis = relationship("Analysis", back_populates="project", uselist=False)
+    
+    __table_args__ = (
+        # Per-user project listings, newest first
+        Index("ix_projects_user_id_created_at", "user_id", "created_at"),
+    )
 
 class Analysis(Base):
     __tablename__ = "analyses"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), unique=True, index=True)
     
     # SERP Data
     serp_results = Column(JSON)  # Top 10 results with titles, URLs, snippets
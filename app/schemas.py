@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+class ProjectOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    keyword: str
+    title: str
+    status: str
+    created_at: datetime
+
+class AnalysisOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    serp_results: Optional[List[Dict[str, Any]]] = None
+    entities: Optional[List[Dict[str, Any]]] = None
+    tfidf_keywords: Optional[List[Dict[str, Any]]] = None
+    competitor_urls: Optional[List[Any]] = None
+    content_outline: Optional[str] = None
+    schema_markup: Optional[str] = None
+    created_at: datetime
+
+class ProjectDataResponse(BaseModel):
+    project: ProjectOut
+    analysis: Optional[AnalysisOut] = None
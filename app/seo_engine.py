@@ -1,11 +1,84 @@
-import requests
 import re
-from typing import Dict, List, Any
-import json
+from typing import Dict, List, Any, Hashable, Optional, Tuple
+from collections import OrderedDict
+import orjson
 import random
+import threading
+import time
+
+# Positions and domains of the mock SERP results
+MOCK_SERP_DOMAINS = tuple((i, f"example{i}.com") for i in range(1, 6))
+
+# Terms that mark a keyword's content category, checked in order
+CATEGORY_PATTERNS = (
+    ('seo', re.compile('seo|search|optimization|ranking')),
+    ('marketing', re.compile('marketing|campaign|strategy|brand')),
+    ('technology', re.compile('tech|software|app|digital|ai')),
+)
+
+# Common SEO concepts with their lower-cased form for matching
+SEO_CONCEPTS = tuple(
+    (term, term.lower()) for term in ('SEO', 'marketing', 'strategy', 'optimization', 'content')
+)
+
+# Related-term suffixes in rank order, with the score each rank receives
+RELATED_TERM_SUFFIXES = (
+    '', ' guide', ' tips', ' strategies', ' best practices', ' examples', ' tools', ' case study'
+)
+RELATED_TERM_SCORES = tuple(round(1.0 - (i * 0.1), 2) for i in range(len(RELATED_TERM_SUFFIXES)))
+
+# Inclusive ranges for mock keyword frequencies and competitor strengths
+FREQUENCY_RANGE = range(5, 51)
+STRENGTH_RANGE = range(30, 91)
+
+# Schema fields filled in per keyword
+SCHEMA_TITLE_FIELDS = {'Article': 'headline', 'HowTo': 'name'}
+SCHEMA_DESCRIPTIONS = {
+    'Article': "Comprehensive guide to {keyword} with expert insights and actionable strategies.",
+    'HowTo': "Step-by-step guide to mastering {keyword} effectively."
+}
+SCHEMA_TITLE_SLOT = '__SCHEMA_TITLE__'
+SCHEMA_DESCRIPTION_SLOT = '__SCHEMA_DESCRIPTION__'
+
+def _json_string(value: str) -> str:
+    """Encode a string as a JSON string literal"""
+    return orjson.dumps(value).decode()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
 
 class SEOEngine:
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 86400, serp_cache_ttl: float = 3600):
+        # Completed analyses keyed by keyword, stored as JSON bytes
+        self._analysis_cache = TTLCache(cache_size, cache_ttl)
+        # SERP results keyed by keyword, stored as JSON bytes like the analyses
+        self._serp_cache = TTLCache(cache_size, serp_cache_ttl)
+        
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -76,9 +149,33 @@ class SEOEngine:
                 ]
             }
         }
+        
+        # Each schema serialized once; only the title and description vary
+        self._schema_json = {}
+        for schema_type, template in self.schema_templates.items():
+            slots = {
+                SCHEMA_TITLE_FIELDS[schema_type]: SCHEMA_TITLE_SLOT,
+                'description': SCHEMA_DESCRIPTION_SLOT
+            }
+            self._schema_json[schema_type] = orjson.dumps(
+                dict(template, **slots), option=orjson.OPT_INDENT_2
+            ).decode()
 
     def run_full_analysis(self, keyword: str) -> Dict[str, Any]:
-        """Run complete SEO analysis for a keyword"""
+        """Run complete SEO analysis for a keyword, reusing recent results"""
+        # Results echo the keyword's spelling, so only an exact match is reused;
+        # decoding the stored bytes hands every caller a result of its own
+        cached = self._analysis_cache.get(keyword)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        result = self._run_analysis(keyword)
+        if result['status'] == 'completed':
+            self._analysis_cache.set(keyword, orjson.dumps(result))
+        return result
+
+    def _run_analysis(self, keyword: str) -> Dict[str, Any]:
+        """Run the full analysis pipeline without consulting the cache"""
         try:
             # Basic keyword analysis
             keyword_data = self._analyze_keyword(keyword)
@@ -89,8 +186,8 @@ class SEOEngine:
             # Generate schema markup
             schema_markup = self._generate_schema_markup(keyword, content_outline['title'])
             
-            # Mock SERP results
-            serp_results = self._get_mock_serp_results(keyword)
+            # SERP results
+            serp_results = self.scrape_serp_results(keyword)
             
             # Extract entities (simplified)
             entities = self._extract_entities(keyword, serp_results)
@@ -154,120 +251,106 @@ class SEOEngine:
     def _generate_schema_markup(self, keyword: str, title: str) -> str:
         """Generate schema markup for the content"""
         schema_type = random.choice(['Article', 'HowTo'])
-        template = self.schema_templates[schema_type]
+        description = SCHEMA_DESCRIPTIONS[schema_type].format(keyword=keyword)
         
-        # Fill in the template
-        schema = template.copy()
-        if schema_type == 'Article':
-            schema['headline'] = title
-            schema['description'] = f"Comprehensive guide to {keyword} with expert insights and actionable strategies."
-        else:
-            schema['name'] = title
-            schema['description'] = f"Step-by-step guide to mastering {keyword} effectively."
-        
-        return json.dumps(schema, indent=2)
+        # Fill the pre-serialized template with JSON-escaped strings
+        return (self._schema_json[schema_type]
+                .replace(f'"{SCHEMA_TITLE_SLOT}"', _json_string(title), 1)
+                .replace(f'"{SCHEMA_DESCRIPTION_SLOT}"', _json_string(description), 1))
 
     def _get_mock_serp_results(self, keyword: str) -> List[Dict[str, Any]]:
         """Generate mock SERP results"""
-        results = []
-        for i in range(5):
-            results.append({
-                'title': f"{keyword.title()} - Complete Guide {i+1}",
-                'url': f"https://example{i+1}.com/{keyword.replace(' ', '-')}",
-                'snippet': f"Learn everything about {keyword} with our comprehensive guide. Expert tips, strategies, and best practices for success.",
-                'position': i + 1,
-                'domain': f"example{i+1}.com"
-            })
-        return results
+        # Per-keyword pieces are computed once and shared by every result
+        title = keyword.title()
+        slug = keyword.replace(' ', '-')
+        snippet = f"Learn everything about {keyword} with our comprehensive guide. Expert tips, strategies, and best practices for success."
+        return [
+            {
+                'title': f"{title} - Complete Guide {position}",
+                'url': f"https://{domain}/{slug}",
+                'snippet': snippet,
+                'position': position,
+                'domain': domain
+            }
+            for position, domain in MOCK_SERP_DOMAINS
+        ]
 
     def _extract_entities(self, keyword: str, serp_results: List[Dict]) -> List[Dict[str, Any]]:
         """Extract entities from keyword and SERP results"""
-        entities = []
-        
         # Add the main keyword as an entity
-        entities.append({
+        entities = [{
             'text': keyword,
             'type': 'KEYWORD',
             'relevance': 1.0
-        })
+        }]
         
         # Extract common words as entities
-        words = keyword.split()
-        for word in words:
-            if len(word) > 3:  # Only significant words
-                entities.append({
-                    'text': word,
-                    'type': 'TERM',
-                    'relevance': 0.8
-                })
+        entities += [
+            {'text': word, 'type': 'TERM', 'relevance': 0.8}
+            for word in keyword.split()
+            if len(word) > 3  # Only significant words
+        ]
         
         # Add some common SEO-related entities
-        seo_terms = ['SEO', 'marketing', 'strategy', 'optimization', 'content']
-        for term in seo_terms:
-            if term.lower() in keyword.lower():
-                entities.append({
-                    'text': term,
-                    'type': 'CONCEPT',
-                    'relevance': 0.9
-                })
+        keyword_lower = keyword.lower()
+        entities += [
+            {'text': term, 'type': 'CONCEPT', 'relevance': 0.9}
+            for term, term_lower in SEO_CONCEPTS
+            if term_lower in keyword_lower
+        ]
         
         return entities
 
     def _generate_tfidf_keywords(self, keyword: str, serp_results: List[Dict]) -> List[Dict[str, Any]]:
         """Generate TF-IDF style keywords"""
         # Create a list of related terms with scores
-        related_terms = [
-            keyword,
-            f"{keyword} guide",
-            f"{keyword} tips",
-            f"{keyword} strategies",
-            f"{keyword} best practices",
-            f"{keyword} examples",
-            f"{keyword} tools",
-            f"{keyword} case study"
-        ]
+        related_terms = [keyword + suffix for suffix in RELATED_TERM_SUFFIXES]
         
-        keywords = []
-        for i, term in enumerate(related_terms):
-            keywords.append({
-                'term': term,
-                'score': round(1.0 - (i * 0.1), 2),
-                'frequency': random.randint(5, 50)
-            })
+        # Draw every frequency in one call
+        frequencies = random.choices(FREQUENCY_RANGE, k=len(related_terms))
         
-        return keywords
+        return [
+            {'term': term, 'score': score, 'frequency': frequency}
+            for term, score, frequency in zip(related_terms, RELATED_TERM_SCORES, frequencies)
+        ]
 
     def _categorize_keyword(self, keyword: str) -> str:
         """Categorize keyword for content template selection"""
         keyword_lower = keyword.lower()
         
-        if any(term in keyword_lower for term in ['seo', 'search', 'optimization', 'ranking']):
-            return 'seo'
-        elif any(term in keyword_lower for term in ['marketing', 'campaign', 'strategy', 'brand']):
-            return 'marketing'
-        elif any(term in keyword_lower for term in ['tech', 'software', 'app', 'digital', 'ai']):
-            return 'technology'
-        else:
-            return 'seo'  # Default
+        for category, pattern in CATEGORY_PATTERNS:
+            if pattern.search(keyword_lower):
+                return category
+        return 'seo'  # Default
 
     def _analyze_competitors(self, serp_results: List[Dict]) -> Dict[str, Any]:
         """Analyze competitor URLs from SERP results"""
-        competitors = []
-        for result in serp_results:
-            competitors.append({
+        # Draw every strength in one call
+        strengths = random.choices(STRENGTH_RANGE, k=len(serp_results))
+        
+        competitors = [
+            {
                 'domain': result['domain'],
                 'url': result['url'],
                 'title': result['title'],
-                'strength': random.randint(30, 90)
-            })
+                'strength': strength
+            }
+            for result, strength in zip(serp_results, strengths)
+        ]
         
         return {
             'total_competitors': len(competitors),
-            'average_strength': sum(c['strength'] for c in competitors) // len(competitors),
+            'average_strength': sum(strengths) // len(strengths),
             'competitors': competitors
         }
 
     def scrape_serp_results(self, keyword: str) -> List[Dict[str, Any]]:
-        """Scrape SERP results (currently returns mock data)"""
-        return self._get_mock_serp_results(keyword)
+        """Scrape SERP results (currently returns mock data), reusing recent results"""
+        cached = self._serp_cache.get(keyword)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        results = self._get_mock_serp_results(keyword)
+        self._serp_cache.set(keyword, orjson.dumps(results))
+        return results
 
@@ -1,119 +1,175 @@
 import re
-from typing import List, Dict, Any
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple
 from datetime import datetime
 
+# Patterns compiled once at import
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+# ASCII characters matched by _NON_WORD_RE, removed with str.translate
+_ASCII_NON_WORD_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c == '_' or c.isspace())
+))
+
+# Display format for timestamps, e.g. "March 04, 2025 at 05:06 AM"
+_TIMESTAMP_FORMAT = "%B %d, %Y at %I:%M %p"
+
+# Characters not allowed in filenames, each mapped to '_'
+_FILENAME_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Characters allowed in keywords: ASCII letters, digits, whitespace, '-' and '_'
+_KEYWORD_CHARS = frozenset(
+    c for c in map(chr, range(128)) if c.isalnum() or c.isspace() or c in '-_'
+)
+
+class _TitleCache(dict):
+    """Dict that title-cases and remembers keys it has not seen before"""
+    def __missing__(self, key: str) -> str:
+        value = self[key] = key.title()
+        return value
+
+# spaCy entity labels and their human-readable names
+_ENTITY_TYPE_DISPLAY = _TitleCache({
+    "PERSON": "Person",
+    "ORG": "Organization",
+    "GPE": "Geographic Location",
+    "LOC": "Location",
+    "PRODUCT": "Product",
+    "EVENT": "Event",
+    "WORK_OF_ART": "Work of Art",
+    "LAW": "Law",
+    "LANGUAGE": "Language",
+    "DATE": "Date",
+    "TIME": "Time",
+    "PERCENT": "Percentage",
+    "MONEY": "Money",
+    "QUANTITY": "Quantity",
+    "ORDINAL": "Ordinal Number",
+    "CARDINAL": "Cardinal Number"
+})
+
+# Keyword importance by TF-IDF score; a score equal to a threshold ranks higher
+_IMPORTANCE_THRESHOLDS = (0.2, 0.5, 0.8)
+_IMPORTANCE_LABELS = ("Very Low", "Low", "Medium", "High")
+
+# Analysis score points per metric, indexed by how many thresholds are reached
+_ENTITY_THRESHOLDS, _ENTITY_POINTS = (2, 5, 10), (0, 10, 20, 30)
+_KEYWORD_THRESHOLDS, _KEYWORD_POINTS = (5, 10, 20), (0, 10, 20, 30)
+_SERP_THRESHOLDS, _SERP_POINTS = (2, 5, 8), (0, 10, 15, 20)
+_OUTLINE_THRESHOLDS, _OUTLINE_POINTS = (51, 201, 501), (0, 10, 15, 20)  # length over 50/200/500
+
 def clean_text(text: str) -> str:
     """Clean and normalize text for analysis"""
     if not text:
         return ""
     
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _HTML_TAG_RE.sub('', text)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = ' '.join(text.split())
     
     # Remove special characters but keep alphanumeric and spaces
-    text = re.sub(r'[^\w\s]', '', text)
+    if text.isascii():
+        text = text.translate(_ASCII_NON_WORD_TABLE)
+    else:
+        text = _NON_WORD_RE.sub('', text)
     
     return text.strip()
 
 def validate_keyword(keyword: str) -> bool:
     """Validate keyword input"""
-    if not keyword or len(keyword.strip()) < 2:
+    if not keyword:
         return False
     
     # Check for minimum length and maximum length
-    if len(keyword.strip()) > 100:
+    keyword = keyword.strip()
+    if not 2 <= len(keyword) <= 100:
         return False
     
     # Check for valid characters
-    if not re.match(r'^[a-zA-Z0-9\s\-_]+$', keyword):
-        return False
-    
-    return True
+    return _has_keyword_chars(keyword)
+
+# Only called with length-checked keywords, so cached entries stay small
+@lru_cache(maxsize=4096)
+def _has_keyword_chars(keyword: str) -> bool:
+    return _KEYWORD_CHARS.issuperset(keyword)
+
+class DisplayEntity(NamedTuple):
+    """Entity formatted for display; use _asdict() where a dict is needed"""
+    text: str
+    type: str
+    type_display: str
+    confidence: float
 
-def format_entities_for_display(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def format_entities_for_display(entities: List[Dict[str, Any]]) -> List[DisplayEntity]:
     """Format entities for better display in UI"""
-    formatted = []
-    
-    for entity in entities:
-        formatted.append({
-            "text": entity.get("text", ""),
-            "type": entity.get("label", ""),
-            "type_display": get_entity_type_display(entity.get("label", "")),
-            "confidence": entity.get("confidence", 0.0)
-        })
-    
-    return formatted
+    return [
+        DisplayEntity(
+            entity.get("text", ""),
+            (label := entity.get("label", "")),
+            _ENTITY_TYPE_DISPLAY[label],
+            entity.get("confidence", 0.0)
+        )
+        for entity in entities
+    ]
 
 def get_entity_type_display(entity_type: str) -> str:
     """Convert entity type to human-readable format"""
-    type_mapping = {
-        "PERSON": "Person",
-        "ORG": "Organization",
-        "GPE": "Geographic Location",
-        "LOC": "Location",
-        "PRODUCT": "Product",
-        "EVENT": "Event",
-        "WORK_OF_ART": "Work of Art",
-        "LAW": "Law",
-        "LANGUAGE": "Language",
-        "DATE": "Date",
-        "TIME": "Time",
-        "PERCENT": "Percentage",
-        "MONEY": "Money",
-        "QUANTITY": "Quantity",
-        "ORDINAL": "Ordinal Number",
-        "CARDINAL": "Cardinal Number"
-    }
-    
-    return type_mapping.get(entity_type, entity_type.title())
+    return _ENTITY_TYPE_DISPLAY[entity_type]
 
 def format_keywords_for_display(keywords: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Format keywords for better display in UI"""
-    formatted = []
-    
-    for keyword in keywords:
-        formatted.append({
+    return [
+        {
             "keyword": keyword.get("keyword", ""),
-            "score": round(keyword.get("score", 0), 3),
+            "score": (score := keyword.get("score", 0)),
             "frequency": keyword.get("frequency", 0),
-            "importance": get_keyword_importance(keyword.get("score", 0))
-        })
-    
-    return formatted
+            "importance": get_keyword_importance(score)
+        }
+        for keyword in keywords
+    ]
+
+def format_content_outline(outline: Dict[str, Any]) -> str:
+    """Render a generated content outline as Markdown text"""
+    parts = [f"# {outline.get('title', '')}"]
+    if outline.get("description"):
+        parts.append(outline["description"])
+    parts.extend(f"## {section}" for section in outline.get("sections", ()))
+    return "\n\n".join(parts)
 
 def get_keyword_importance(score: float) -> str:
     """Determine keyword importance based on TF-IDF score"""
-    if score >= 0.8:
-        return "High"
-    elif score >= 0.5:
-        return "Medium"
-    elif score >= 0.2:
-        return "Low"
-    else:
-        return "Very Low"
+    return _IMPORTANCE_LABELS[bisect_right(_IMPORTANCE_THRESHOLDS, score)]
 
+@lru_cache(maxsize=4096)
 def generate_project_title(keyword: str) -> str:
     """Generate a project title based on keyword"""
     return f"{keyword.title()} - SEO Analysis"
 
+@lru_cache(maxsize=4096)
 def format_timestamp(timestamp: datetime) -> str:
     """Format timestamp for display"""
-    return timestamp.strftime("%B %d, %Y at %I:%M %p")
+    return timestamp.strftime(_TIMESTAMP_FORMAT)
 
 def truncate_text(text: str, max_length: int = 100) -> str:
     """Truncate text to specified length"""
     if len(text) <= max_length:
         return text
     
-    return text[:max_length].rsplit(' ', 1)[0] + "..."
+    # Cut at the last space within the limit, or hard-cut if there is none
+    cut = text.rfind(' ', 0, max_length)
+    if cut == -1:
+        cut = max_length
+    
+    return text[:cut] + "..."
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file operations"""
     # Remove or replace invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = filename.translate(_FILENAME_TABLE)
     
     # Remove leading/trailing spaces and dots
     filename = filename.strip(' .')
@@ -126,43 +182,11 @@ def sanitize_filename(filename: str) -> str:
 
 def calculate_analysis_score(analysis: Dict[str, Any]) -> int:
     """Calculate a score for the analysis quality"""
-    score = 0
-    
-    # Score based on number of entities found
-    entities_count = len(analysis.get("entities", []))
-    if entities_count >= 10:
-        score += 30
-    elif entities_count >= 5:
-        score += 20
-    elif entities_count >= 2:
-        score += 10
-    
-    # Score based on number of keywords found
-    keywords_count = len(analysis.get("tfidf_keywords", []))
-    if keywords_count >= 20:
-        score += 30
-    elif keywords_count >= 10:
-        score += 20
-    elif keywords_count >= 5:
-        score += 10
-    
-    # Score based on SERP results
-    serp_count = analysis.get("total_results", 0)
-    if serp_count >= 8:
-        score += 20
-    elif serp_count >= 5:
-        score += 15
-    elif serp_count >= 2:
-        score += 10
-    
-    # Score based on content outline quality
-    outline = analysis.get("content_outline", "")
-    if len(outline) > 500:
-        score += 20
-    elif len(outline) > 200:
-        score += 15
-    elif len(outline) > 50:
-        score += 10
-    
-    return min(score, 100)  # Cap at 100
+    # Entities, keywords, SERP results and outline length; the points top out at 100
+    return (
+        _ENTITY_POINTS[bisect_right(_ENTITY_THRESHOLDS, len(analysis.get("entities") or ()))]
+        + _KEYWORD_POINTS[bisect_right(_KEYWORD_THRESHOLDS, len(analysis.get("tfidf_keywords") or ()))]
+        + _SERP_POINTS[bisect_right(_SERP_THRESHOLDS, analysis.get("total_results", 0))]
+        + _OUTLINE_POINTS[bisect_right(_OUTLINE_THRESHOLDS, len(analysis.get("content_outline") or ""))]
+    )
 
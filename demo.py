@@ -13,8 +13,6 @@ from dotenv import load_dotenv
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from seo_engine import SEOEngine
-
 def main():
     """Run a demo of the SEO engine"""
     print("🚀 SEO Content Generator Demo (Free AI Version)")
@@ -32,6 +30,9 @@ def main():
     # Initialize SEO engine
     print("🔄 Initializing SEO engine...")
     try:
+        # Imported here so the engine sees the environment loaded above
+        from seo_engine import SEOEngine
+        from utils import format_content_outline
         seo_engine = SEOEngine()
         print("✅ SEO engine initialized successfully")
     except Exception as e:
@@ -67,26 +68,29 @@ def main():
             print("🏷️  Extracted Entities:")
             entities = results['analysis']['entities']
             for entity in entities[:5]:
-                print(f"   • {entity['text']} ({entity['label']})")
+                print(f"   • {entity['text']} ({entity['type']})")
             print()
             
             print("🔑 Top Keywords (TF-IDF):")
             keywords = results['analysis']['tfidf_keywords']
             for keyword in keywords[:10]:
-                print(f"   • {keyword['keyword']} (Score: {keyword['score']:.3f})")
+                print(f"   • {keyword['term']} (Score: {keyword['score']:.3f})")
             print()
             
             print("📋 Content Outline Preview:")
-            outline_lines = results['content_outline'].split('\n')[:10]
-            for line in outline_lines:
+            # At most 11 pieces: ten preview lines plus the unsplit remainder
+            outline_lines = format_content_outline(
+                results['analysis']['content_outline']
+            ).split('\n', 10)
+            for line in outline_lines[:10]:
                 if line.strip():
                     print(f"   {line}")
-            if len(results['content_outline'].split('\n')) > 10:
+            if len(outline_lines) > 10:
                 print("   ... (truncated)")
             print()
             
             print("🏗️  Schema Markup Preview:")
-            schema_lines = results['schema_markup'].split('\n')[:5]
+            schema_lines = results['analysis']['schema_markup'].split('\n', 5)[:5]
             for line in schema_lines:
                 print(f"   {line}")
             print("   ... (truncated)")
@@ -17,13 +17,13 @@ Author: SEO Content Generator Team
 License: MIT
 """
 
+import asyncio
 import uvicorn
-from app.main import app
 from app.database import create_tables
 
 if __name__ == "__main__":
     # Create database tables on startup
-    create_tables()
+    asyncio.run(create_tables())
     
     # Run the application
     uvicorn.run(
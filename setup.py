@@ -12,10 +12,10 @@ import subprocess
 import platform
 
 def run_command(command, description):
-    """Run a shell command and handle errors"""
+    """Run a command given as an argument list and handle errors"""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -38,7 +38,7 @@ def create_virtual_environment():
         print("✅ Virtual environment already exists")
         return True
     
-    return run_command("python -m venv venv", "Creating virtual environment")
+    return run_command([sys.executable, "-m", "venv", "venv"], "Creating virtual environment")
 
 def activate_virtual_environment():
     """Activate the virtual environment"""
@@ -52,11 +52,17 @@ def activate_virtual_environment():
 
 def install_dependencies():
     """Install required dependencies"""
-    return run_command("pip install -r requirements.txt", "Installing dependencies")
+    return run_command(
+        [sys.executable, "-m", "pip", "install", "--no-input", "-r", "requirements.txt"],
+        "Installing dependencies"
+    )
 
 def download_spacy_model():
     """Download the required spaCy model"""
-    return run_command("python -m spacy download en_core_web_sm", "Downloading spaCy model")
+    return run_command(
+        [sys.executable, "-m", "spacy", "download", "en_core_web_sm"],
+        "Downloading spaCy model"
+    )
 
 def create_env_file():
     """Create environment configuration file"""